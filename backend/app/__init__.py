@@ -1,3 +1,10 @@
 """Carbon Emission Prediction API"""
 
+import os
+
+# Each prediction is tiny and requests run concurrently on a thread pool, so
+# multithreaded BLAS only causes contention. Set before numpy is imported.
+for _var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
 __version__ = "1.0.0"
\ No newline at end of file
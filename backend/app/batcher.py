@@ -0,0 +1,179 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+from .models import PredictionRequest
+from .predictor import CarbonEmissionPredictor
+from .config import (
+    PREDICT_BATCH_MAX_SIZE,
+    PREDICT_BATCH_MAX_WAIT_MS,
+    PREDICT_BATCH_MAX_IN_FLIGHT
+)
+
+logger = logging.getLogger(__name__)
+
+# Queued work: the request, the predictor resolved for it, and its caller
+_Item = Tuple[PredictionRequest, CarbonEmissionPredictor, asyncio.Future]
+
+
+class PredictionBatcher:
+    """Coalesce concurrent single predictions into one batch model call"""
+
+    def __init__(
+        self,
+        predict_batch: Callable[
+            [CarbonEmissionPredictor, List[PredictionRequest]], np.ndarray
+        ],
+        max_batch: int = PREDICT_BATCH_MAX_SIZE,
+        max_wait_ms: float = PREDICT_BATCH_MAX_WAIT_MS,
+        max_in_flight: int = PREDICT_BATCH_MAX_IN_FLIGHT
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_in_flight = max_in_flight
+        self._queue: Optional[asyncio.Queue] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[Executor] = None
+        self._dispatches: set = set()
+
+    def start(self, executor: Optional[Executor] = None):
+        """Start the background batching loop on the running event loop"""
+        if executor is not None:
+            self._executor = executor
+        if self._task is not None and not self._task.done():
+            return
+        self._queue = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the batching loop and wait for in-flight batches"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._queue is not None:
+            # Fail requests that were queued but never reached a batch
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._reject(pending)
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+        # The owner shuts its executor down after stop(); don't reuse it
+        self._executor = None
+
+    @staticmethod
+    def _reject(items: List[_Item]):
+        """Fail waiting callers whose requests will never be predicted"""
+        for _, _, future in items:
+            if not future.done():
+                future.set_exception(
+                    RuntimeError("Prediction batcher stopped")
+                )
+
+    async def submit(
+        self,
+        request: PredictionRequest,
+        predictor: CarbonEmissionPredictor
+    ) -> float:
+        """
+        Queue a request and wait for its prediction
+
+        Args:
+            request: PredictionRequest object
+            predictor: Predictor resolved for this request (FastAPI dependency)
+
+        Returns:
+            Predicted carbon emission in kg CO₂e
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, predictor, future))
+        return await future
+
+    async def _run(self):
+        """Collect queued requests into batches and dispatch them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            try:
+                while len(items) < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        items.append(
+                            await asyncio.wait_for(self._queue.get(), timeout)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+
+                # Cap the number of batches running in the executor at once
+                await self._semaphore.acquire()
+            except asyncio.CancelledError:
+                # Stopped while collecting; don't leave these callers hanging
+                self._reject(items)
+                raise
+            task = asyncio.create_task(self._dispatch(items))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, items: List[_Item]):
+        """Run batch predictions and fan results out to waiting callers"""
+        groups: Dict[CarbonEmissionPredictor, list] = {}
+        for req, predictor, future in items:
+            groups.setdefault(predictor, []).append((req, future))
+
+        try:
+            for predictor, group in groups.items():
+                await self._dispatch_group(predictor, group)
+        finally:
+            self._semaphore.release()
+
+    async def _dispatch_group(
+        self,
+        predictor: CarbonEmissionPredictor,
+        group: List[Tuple[PredictionRequest, asyncio.Future]]
+    ):
+        """Run one predictor's share of a batch"""
+        try:
+            requests = [req for req, _ in group]
+            loop = asyncio.get_running_loop()
+            emissions_kg = await loop.run_in_executor(
+                self._executor, self.predict_batch, predictor, requests
+            )
+        except Exception as e:
+            logger.error(f"Batched prediction error: {e}")
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), emission_kg in zip(group, emissions_kg.tolist()):
+                if not future.done():
+                    future.set_result(emission_kg)
+
+
+def _predict_batch(
+    predictor: CarbonEmissionPredictor,
+    requests: List[PredictionRequest]
+) -> np.ndarray:
+    """Run one coalesced batch on the given predictor"""
+    # Under light load most batches hold one request; the 1-row path
+    # reuses a preallocated frame instead of the batch buffers
+    if len(requests) == 1:
+        return np.array([predictor.predict_single(requests[0])])
+    return predictor.predict_batch(requests)
+
+
+# Global batcher instance
+batcher = PredictionBatcher(_predict_batch)
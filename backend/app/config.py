@@ -12,20 +12,36 @@ API_TITLE = "Carbon Emission Prediction API"
 API_VERSION = "1.0.0"
 API_DESCRIPTION = "API for predicting carbon emissions based on logistics data"
 
+# Server settings (used when running app.main directly)
+API_RELOAD = os.getenv("API_RELOAD", "").lower() in ("1", "true", "yes")
+API_WORKERS = int(os.getenv("API_WORKERS", "2"))
+
 # CORS settings
-# CORS settings
-ALLOWED_ORIGINS = os.getenv("CORS_ORIGINS", "").split(",")
-ALLOWED_ORIGINS = [origin.strip() for origin in ALLOWED_ORIGINS if origin.strip()]
-ALLOWED_ORIGINS += [
-    "http://localhost:3000",
-    "http://localhost:3001",
-    "http://127.0.0.1:3000",
-]
+# Built once as a deduplicated tuple: env origins first, then local dev origins
+ALLOWED_ORIGINS = tuple(dict.fromkeys(
+    [o.strip() for o in os.getenv("CORS_ORIGINS", "").split(",") if o.strip()]
+    + [
+        "http://localhost:3000",
+        "http://localhost:3001",
+        "http://127.0.0.1:3000",
+    ]
+))
 
 # Feature validation
-VALID_VEHICLE_TYPES = ["truck", "van", "bike", "cargo_bike", "electric_van"]
-VALID_ROUTE_TYPES = ["highway", "urban", "mixed", "rural"]
+VALID_VEHICLE_TYPES = frozenset({"truck", "van", "bike", "cargo_bike", "electric_van"})
+VALID_ROUTE_TYPES = frozenset({"highway", "urban", "mixed", "rural"})
 
 # Distance validation
 MIN_DISTANCE_KM = 0.1
-MAX_DISTANCE_KM = 10000
\ No newline at end of file
+MAX_DISTANCE_KM = 10000
+
+# Maximum number of predictions per batch request
+MAX_BATCH_SIZE = 100
+
+# Number of distinct route predictions kept in the in-process LRU cache
+PREDICTION_CACHE_SIZE = 4096
+
+# Micro-batching for /predict
+PREDICT_BATCH_MAX_SIZE = 64
+PREDICT_BATCH_MAX_WAIT_MS = 5
+PREDICT_BATCH_MAX_IN_FLIGHT = 4
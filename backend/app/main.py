@@ -1,8 +1,13 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+import asyncio
 import logging
-from typing import List
+import os
+import numpy as np
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
 from .models import (
     PredictionRequest,
@@ -11,12 +16,15 @@ from .models import (
     BatchPredictionResponse,
     HealthResponse
 )
-from .predictor import predictor
+from .predictor import CarbonEmissionPredictor, get_predictor
+from .batcher import batcher
 from .config import (
     API_TITLE,
     API_VERSION,
     API_DESCRIPTION,
-    ALLOWED_ORIGINS
+    ALLOWED_ORIGINS,
+    API_RELOAD,
+    API_WORKERS
 )
 
 # Configure logging
@@ -26,11 +34,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Thread pool for model inference so predictions don't block the event loop.
+# Created per app startup so a shutdown/startup cycle gets a live pool; until
+# then run_in_executor(None, ...) falls back to the loop's default pool.
+executor: Optional[ThreadPoolExecutor] = None
+
+
+class NDJSONResponse(StreamingResponse):
+    """Streaming newline-delimited JSON; declares its media type for OpenAPI"""
+    media_type = "application/x-ndjson"
+
+
 # Create FastAPI app
 app = FastAPI(
     title=API_TITLE,
     version=API_VERSION,
-    description=API_DESCRIPTION
+    description=API_DESCRIPTION,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -43,6 +63,53 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def start_batcher():
+    """Create the inference pool and start the /predict micro-batching loop"""
+    global executor
+    executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+    batcher.start(executor)
+
+
+def _warmup_predict(predictor: CarbonEmissionPredictor):
+    """Run one dummy prediction through the pipeline"""
+    predictor.predict_batch([
+        PredictionRequest(
+            origin_facility="WH_Bangalore",
+            vehicle_type="truck",
+            route_type="highway",
+            distance_km=10.0
+        )
+    ])
+
+
+@app.on_event("startup")
+async def warmup_model():
+    """Pay model load and first-predict costs before serving traffic"""
+    loop = asyncio.get_running_loop()
+    
+    # Resolve the predictor as FastAPI would, so dependency overrides
+    # (sync or async, e.g. in tests) skip loading the real model
+    resolve_predictor = app.dependency_overrides.get(get_predictor, get_predictor)
+    if asyncio.iscoroutinefunction(resolve_predictor):
+        predictor = await resolve_predictor()
+    else:
+        predictor = await loop.run_in_executor(executor, resolve_predictor)
+    
+    await loop.run_in_executor(executor, _warmup_predict, predictor)
+    logger.info("Model warm-up complete")
+
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    """Stop the /predict micro-batching loop and the inference pool"""
+    global executor
+    await batcher.stop()
+    if executor is not None:
+        executor.shutdown()
+        executor = None
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint"""
@@ -54,7 +121,9 @@ async def root():
 
 
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
-async def health_check():
+async def health_check(
+    predictor: CarbonEmissionPredictor = Depends(get_predictor)
+):
     """Health check endpoint"""
     return HealthResponse(
         status="healthy" if predictor.is_loaded() else "unhealthy",
@@ -69,7 +138,10 @@ async def health_check():
     status_code=status.HTTP_200_OK,
     tags=["Prediction"]
 )
-async def predict_emission(request: PredictionRequest):
+async def predict_emission(
+    request: PredictionRequest,
+    predictor: CarbonEmissionPredictor = Depends(get_predictor)
+):
     """
     Predict carbon emission for a single logistics route
     
@@ -79,24 +151,35 @@ async def predict_emission(request: PredictionRequest):
     - **distance_km**: Distance in kilometers
     """
     try:
-        # Make prediction
-        emission_kg = predictor.predict_single(request)
+        # Repeat routes are answered from the cache right away; only misses
+        # wait for the coalescing window and go to the model
+        emission_kg = predictor.lookup_cached(request)
+        if emission_kg is None:
+            # Make prediction (coalesced with concurrent requests)
+            emission_kg = await batcher.submit(request, predictor)
         
         # Convert to tons
         emission_tons = emission_kg / 1000
         
         logger.info(
-            f"Prediction: {request.origin_facility} → "
-            f"{request.vehicle_type} → {request.route_type} → "
-            f"{request.distance_km}km = {emission_kg:.2f} kgCO₂e"
+            "Prediction: %s -> %s -> %s -> %skm = %.2f kgCO2e",
+            request.origin_facility,
+            request.vehicle_type,
+            request.route_type,
+            request.distance_km,
+            emission_kg
         )
         
-        return PredictionResponse(
+        # Every field is produced here, so build the response without
+        # validation and return it directly; FastAPI would otherwise dump and
+        # re-validate it against response_model, which is kept for the docs
+        response = PredictionResponse.model_construct(
             predicted_emission_kgco2e=round(emission_kg, 2),
             predicted_emission_tons=round(emission_tons, 4),
             input_data=request,
             model_version=API_VERSION
         )
+        return ORJSONResponse(content=response.model_dump())
         
     except Exception as e:
         logger.error(f"Prediction error: {e}")
@@ -112,7 +195,10 @@ async def predict_emission(request: PredictionRequest):
     status_code=status.HTTP_200_OK,
     tags=["Prediction"]
 )
-async def predict_emissions_batch(request: BatchPredictionRequest):
+async def predict_emissions_batch(
+    request: BatchPredictionRequest,
+    predictor: CarbonEmissionPredictor = Depends(get_predictor)
+):
     """
     Predict carbon emissions for multiple logistics routes
     
@@ -120,36 +206,46 @@ async def predict_emissions_batch(request: BatchPredictionRequest):
     """
     try:
         # Make batch prediction
-        emissions_kg = predictor.predict_batch(request.predictions)
+        emissions_kg = await asyncio.get_running_loop().run_in_executor(
+            executor, predictor.predict_batch, request.predictions
+        )
         
-        # Create individual responses
-        results = []
-        total_emission_kg = 0
+        # Convert and round all predictions in one vectorized pass
+        emissions_kg_rounded = np.round(emissions_kg, 2).tolist()
+        emissions_tons_rounded = np.round(emissions_kg / 1000, 4).tolist()
+        total_emission_kg = float(emissions_kg.sum())
         
-        for req, emission_kg in zip(request.predictions, emissions_kg):
-            emission_tons = emission_kg / 1000
-            total_emission_kg += emission_kg
-            
-            results.append(PredictionResponse(
-                predicted_emission_kgco2e=round(emission_kg, 2),
-                predicted_emission_tons=round(emission_tons, 4),
+        # Create individual responses
+        results = [
+            PredictionResponse.model_construct(
+                predicted_emission_kgco2e=emission_kg,
+                predicted_emission_tons=emission_tons,
                 input_data=req,
                 model_version=API_VERSION
-            ))
+            )
+            for req, emission_kg, emission_tons in zip(
+                request.predictions,
+                emissions_kg_rounded,
+                emissions_tons_rounded
+            )
+        ]
         
         total_emission_tons = total_emission_kg / 1000
         
         logger.info(
-            f"Batch prediction: {len(results)} routes, "
-            f"Total: {total_emission_kg:.2f} kgCO₂e"
+            "Batch prediction: %d routes, Total: %.2f kgCO2e",
+            len(results),
+            total_emission_kg
         )
         
-        return BatchPredictionResponse(
+        # Returned directly to skip response_model validation, as in /predict
+        response = BatchPredictionResponse.model_construct(
             results=results,
             total_count=len(results),
             total_emission_kgco2e=round(total_emission_kg, 2),
             total_emission_tons=round(total_emission_tons, 4)
         )
+        return ORJSONResponse(content=response.model_dump())
         
     except Exception as e:
         logger.error(f"Batch prediction error: {e}")
@@ -159,6 +255,58 @@ async def predict_emissions_batch(request: BatchPredictionRequest):
         )
 
 
+@app.post(
+    "/predict/batch/stream",
+    response_class=NDJSONResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["Prediction"]
+)
+async def predict_emissions_batch_stream(
+    request: BatchPredictionRequest,
+    predictor: CarbonEmissionPredictor = Depends(get_predictor)
+):
+    """
+    Predict carbon emissions for multiple logistics routes as NDJSON
+    
+    Streams one prediction object per line, in request order, without
+    building the full batch response in memory. Maximum 100 predictions
+    per request.
+    """
+    try:
+        # Make batch prediction
+        emissions_kg = await asyncio.get_running_loop().run_in_executor(
+            executor, predictor.predict_batch, request.predictions
+        )
+    except Exception as e:
+        logger.error(f"Batch stream prediction error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch prediction failed: {str(e)}"
+        )
+    
+    emissions_kg_rounded = np.round(emissions_kg, 2).tolist()
+    emissions_tons_rounded = np.round(emissions_kg / 1000, 4).tolist()
+    
+    logger.info("Batch stream prediction: %d routes", len(emissions_kg_rounded))
+    
+    # Async so Starlette iterates on the event loop instead of hopping to
+    # the threadpool once per row
+    async def rows():
+        for req, emission_kg, emission_tons in zip(
+            request.predictions,
+            emissions_kg_rounded,
+            emissions_tons_rounded
+        ):
+            yield orjson.dumps({
+                "predicted_emission_kgco2e": emission_kg,
+                "predicted_emission_tons": emission_tons,
+                "input_data": req.model_dump(),
+                "model_version": API_VERSION
+            }) + b"\n"
+    
+    return NDJSONResponse(rows())
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
@@ -171,9 +319,14 @@ async def global_exception_handler(request, exc):
 
 if __name__ == "__main__":
     import uvicorn
+    # uvloop where available (not on Windows) and httptools for production;
+    # API_RELOAD=1 for a single reloading dev server
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        loop="auto",
+        http="httptools",
+        workers=1 if API_RELOAD else API_WORKERS,
+        reload=API_RELOAD
     )
\ No newline at end of file
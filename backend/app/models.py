@@ -1,38 +1,32 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field, StringConstraints
+from typing import Annotated, Optional
+
+from .config import MIN_DISTANCE_KM, MAX_DISTANCE_KM, MAX_BATCH_SIZE
+
+# Stripped inside pydantic-core rather than by a Python field_validator
+StrippedStr = Annotated[str, StringConstraints(strip_whitespace=True)]
 
 class PredictionRequest(BaseModel):
     """Request model for carbon emission prediction"""
-    origin_facility: str = Field(
+    origin_facility: StrippedStr = Field(
         ..., 
         description="Origin warehouse/facility (e.g., 'WH_Bangalore')",
         min_length=1
     )
-    vehicle_type: str = Field(
+    vehicle_type: StrippedStr = Field(
         ..., 
         description="Type of vehicle (e.g., 'truck', 'van', 'bike')"
     )
-    route_type: str = Field(
+    route_type: StrippedStr = Field(
         ..., 
         description="Type of route (e.g., 'highway', 'urban', 'mixed')"
     )
     distance_km: float = Field(
         ..., 
         description="Distance in kilometers",
-        gt=0
+        ge=MIN_DISTANCE_KM,
+        le=MAX_DISTANCE_KM
     )
-    
-    @field_validator('vehicle_type', 'route_type')
-    @classmethod
-    def clean_strings(cls, v: str) -> str:
-        """Clean strings for consistency without changing case"""
-        return v.strip()
-    
-    @field_validator('origin_facility')
-    @classmethod
-    def validate_origin(cls, v: str) -> str:
-        """Validate and clean origin facility"""
-        return v.strip()
 
     model_config = {
         "json_schema_extra": {
@@ -87,7 +81,7 @@ class BatchPredictionRequest(BaseModel):
         ..., 
         description="List of prediction requests",
         min_length=1,
-        max_length=100
+        max_length=MAX_BATCH_SIZE
     )
 
 
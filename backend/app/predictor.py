@@ -1,19 +1,112 @@
 import joblib
+import numpy as np
 import pandas as pd
+from starlette.concurrency import run_in_threadpool
+from threadpoolctl import threadpool_limits
 from pathlib import Path
+import functools
 import logging
-from typing import List
+import operator
+import queue
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
 from .models import PredictionRequest
-from .config import MODEL_PATH
+from .config import MODEL_PATH, MAX_BATCH_SIZE, PREDICTION_CACHE_SIZE
 
 logger = logging.getLogger(__name__)
 
+# Exact column order expected by model
+FEATURE_COLUMNS = ["origin_facility", "vehicle_type", "route_type", "distance_km"]
+
+# Extracts all feature fields of a request in one call
+_request_features = operator.attrgetter(*FEATURE_COLUMNS)
+
+class _PredictionCache:
+    """Thread-safe LRU cache of predictions keyed by feature tuple"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_many(self, keys: Iterable[tuple]) -> Dict[tuple, float]:
+        """Return the cached predictions for whichever keys are present"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is not None:
+                    self._data.move_to_end(key)
+                    found[key] = value
+        return found
+    
+    def put_many(self, keys: Iterable[tuple], values: Iterable[float]):
+        """Store predictions, evicting the least recently used entries"""
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached predictions"""
+        with self._lock:
+            self._data.clear()
+
+
+def _new_single_frame() -> pd.DataFrame:
+    """Create a 1-row input frame with the model's column order and dtypes"""
+    return pd.DataFrame({
+        "origin_facility": [""],
+        "vehicle_type": [""],
+        "route_type": [""],
+        "distance_km": [0.0]
+    }, columns=FEATURE_COLUMNS)
+
+
+class _BatchBuffer:
+    """Preallocated per-feature column arrays reused across batch predictions"""
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.origin_facility = np.empty(capacity, dtype=object)
+        self.vehicle_type = np.empty(capacity, dtype=object)
+        self.route_type = np.empty(capacity, dtype=object)
+        self.distance_km = np.empty(capacity, dtype=np.float64)
+    
+    def fill(self, rows: List[tuple]) -> pd.DataFrame:
+        """Write feature rows into the buffers and return a DataFrame view"""
+        n = len(rows)
+        ofac, vt, rt, dk = zip(*rows)
+        self.origin_facility[:n] = ofac
+        self.vehicle_type[:n] = vt
+        self.route_type[:n] = rt
+        self.distance_km[:n] = dk
+        
+        return pd.DataFrame({
+            "origin_facility": self.origin_facility[:n],
+            "vehicle_type": self.vehicle_type[:n],
+            "route_type": self.route_type[:n],
+            "distance_km": self.distance_km[:n]
+        }, columns=FEATURE_COLUMNS, copy=False)
+
+
 class CarbonEmissionPredictor:
     """Carbon emission prediction using trained ML model"""
     
     def __init__(self, model_path: Path = MODEL_PATH):
         self.model_path = model_path
         self.model = None
+        # Pool of reusable 1-row input frames for predict_single; cells are
+        # overwritten in place instead of building a new DataFrame per request
+        self._single_frames: queue.SimpleQueue = queue.SimpleQueue()
+        # Pool of batch input buffers; each concurrent batch call takes its
+        # own so threads never share one while the model reads it
+        self._batch_buffers: queue.SimpleQueue = queue.SimpleQueue()
+        # Repeat queries for the same route are answered without the model
+        self._cache = _PredictionCache(PREDICTION_CACHE_SIZE)
         self.load_model()
     
     def load_model(self):
@@ -21,10 +114,34 @@ class CarbonEmissionPredictor:
         try:
             logger.info(f"Loading model from {self.model_path}")
             self.model = joblib.load(self.model_path)
+            self._cache.clear()
             logger.info("✅ Model loaded successfully")
         except Exception as e:
             logger.error(f"❌ Failed to load model: {e}")
             raise RuntimeError(f"Could not load model: {e}")
+        
+        # The regressor was trained with n_jobs=-1, which spawns joblib
+        # threads on every predict on top of our inference thread pool
+        steps = getattr(self.model, "named_steps", {})
+        if "regressor" in steps and "n_jobs" in steps["regressor"].get_params():
+            self.model.set_params(regressor__n_jobs=1)
+        
+        # Also cap BLAS/OpenMP pools that were initialised before the
+        # environment defaults in app/__init__.py could take effect
+        threadpool_limits(limits=1)
+    
+    def lookup_cached(self, request: PredictionRequest) -> Optional[float]:
+        """
+        Return the cached prediction for a request without touching the model
+        
+        Args:
+            request: PredictionRequest object
+            
+        Returns:
+            Cached carbon emission in kg CO₂e, or None on a cache miss
+        """
+        key = _request_features(request)
+        return self._cache.get_many((key,)).get(key)
     
     def predict_single(self, request: PredictionRequest) -> float:
         """
@@ -39,20 +156,33 @@ class CarbonEmissionPredictor:
         if self.model is None:
             raise RuntimeError("Model not loaded")
         
-        # Create DataFrame with exact column order expected by model
-        input_df = pd.DataFrame({
-            "origin_facility": [request.origin_facility],
-            "vehicle_type": [request.vehicle_type],
-            "route_type": [request.route_type],
-            "distance_km": [request.distance_km]
-        })
+        cached = self.lookup_cached(request)
+        if cached is not None:
+            return cached
+        
+        # Each concurrent caller takes its own frame, so no lock is needed
+        try:
+            input_df = self._single_frames.get_nowait()
+        except queue.Empty:
+            input_df = _new_single_frame()
         
-        # Make prediction
-        prediction = self.model.predict(input_df)
+        try:
+            input_df.iat[0, 0] = request.origin_facility
+            input_df.iat[0, 1] = request.vehicle_type
+            input_df.iat[0, 2] = request.route_type
+            input_df.iat[0, 3] = request.distance_km
+            
+            # Make prediction
+            prediction = self.model.predict(input_df)
+        finally:
+            self._single_frames.put(input_df)
         
-        return float(prediction[0])
+        emission_kg = float(prediction[0])
+        self._cache.put_many((_request_features(request),), (emission_kg,))
+        
+        return emission_kg
     
-    def predict_batch(self, requests: List[PredictionRequest]) -> List[float]:
+    def predict_batch(self, requests: List[PredictionRequest]) -> np.ndarray:
         """
         Predict carbon emissions for multiple requests
         
@@ -60,31 +190,87 @@ class CarbonEmissionPredictor:
             requests: List of PredictionRequest objects
             
         Returns:
-            List of predicted carbon emissions in kg CO₂e
+            Array of predicted carbon emissions in kg CO₂e
         """
         if self.model is None:
             raise RuntimeError("Model not loaded")
         
-        # Create DataFrame from all requests
-        input_df = pd.DataFrame([
-            {
-                "origin_facility": req.origin_facility,
-                "vehicle_type": req.vehicle_type,
-                "route_type": req.route_type,
-                "distance_km": req.distance_km
-            }
-            for req in requests
-        ])
-        
-        # Make predictions
-        predictions = self.model.predict(input_df)
-        
-        return [float(pred) for pred in predictions]
+        # Only predict each distinct feature tuple once; order is preserved
+        keys = list(map(_request_features, requests))
+        unique_keys = list(dict.fromkeys(keys))
+        
+        results = self._cache.get_many(unique_keys)
+        misses = [key for key in unique_keys if key not in results]
+        if misses:
+            predictions = self._predict_rows(misses)
+            values = predictions.tolist()
+            self._cache.put_many(misses, values)
+            if len(misses) == len(keys):
+                return predictions
+            results.update(zip(misses, values))
+        
+        # Scatter unique predictions back to the original request order
+        return np.fromiter(
+            (results[key] for key in keys), dtype=np.float64, count=len(keys)
+        )
+    
+    def _predict_rows(self, rows: List[tuple]) -> np.ndarray:
+        """Run the model on distinct feature rows"""
+        # Reuse preallocated column buffers instead of building lists per call
+        try:
+            buffer = self._batch_buffers.get_nowait()
+        except queue.Empty:
+            buffer = _BatchBuffer(MAX_BATCH_SIZE)
+        
+        if len(rows) > buffer.capacity:
+            # Oversized batches get a one-off buffer and don't enter the pool
+            self._batch_buffers.put(buffer)
+            buffer = _BatchBuffer(len(rows))
+        
+        try:
+            input_df = buffer.fill(rows)
+            
+            # Make predictions
+            return self.model.predict(input_df).astype(np.float64, copy=False)
+        finally:
+            if buffer.capacity == MAX_BATCH_SIZE:
+                self._batch_buffers.put(buffer)
     
     def is_loaded(self) -> bool:
         """Check if model is loaded"""
         return self.model is not None
 
 
-# Global predictor instance
-predictor = CarbonEmissionPredictor()
\ No newline at end of file
+_predictor_lock = threading.Lock()
+_default_predictor: Optional[CarbonEmissionPredictor] = None
+
+
+@functools.lru_cache(maxsize=4)
+def _load_predictor(path: str) -> CarbonEmissionPredictor:
+    """Load and cache a predictor per model path"""
+    return CarbonEmissionPredictor(Path(path))
+
+
+def _load_default_predictor() -> CarbonEmissionPredictor:
+    """Load the predictor for MODEL_PATH once, even under concurrent callers"""
+    global _default_predictor
+    # The lock stops concurrent first requests from loading the model twice
+    with _predictor_lock:
+        if _default_predictor is None:
+            _default_predictor = _load_predictor(str(MODEL_PATH))
+        return _default_predictor
+
+
+async def get_predictor() -> CarbonEmissionPredictor:
+    """
+    Get the shared predictor, loading the model on first use
+    
+    Used as a FastAPI dependency so tests can override it and workers
+    that never predict never load the model.
+    """
+    # Async so loaded-model requests skip FastAPI's threadpool hop and lock;
+    # only the first load runs in a thread
+    predictor = _default_predictor
+    if predictor is None:
+        predictor = await run_in_threadpool(_load_default_predictor)
+    return predictor
@@ -0,0 +1,164 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from app.batcher import PredictionBatcher, _predict_batch
+from app.models import PredictionRequest
+
+
+class FakePredictor:
+    """Predictor stand-in returning distance * factor and recording calls"""
+
+    def __init__(self, factor: float = 2.0, error: Exception = None):
+        self.factor = factor
+        self.error = error
+        self.batch_calls = []
+        self.single_calls = []
+
+    def predict_single(self, request):
+        self.single_calls.append(request)
+        if self.error is not None:
+            raise self.error
+        return request.distance_km * self.factor
+
+    def predict_batch(self, requests):
+        self.batch_calls.append(list(requests))
+        if self.error is not None:
+            raise self.error
+        return np.array([r.distance_km * self.factor for r in requests])
+
+
+def make_request(distance_km: float) -> PredictionRequest:
+    return PredictionRequest(
+        origin_facility="WH_Bangalore",
+        vehicle_type="truck",
+        route_type="highway",
+        distance_km=distance_km
+    )
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_submits_coalesce_into_one_batch():
+    async def scenario():
+        batcher = PredictionBatcher(_predict_batch, max_wait_ms=50)
+        predictor = FakePredictor()
+        requests = [make_request(d) for d in (1.0, 2.0, 3.0, 4.0, 5.0)]
+        try:
+            results = await asyncio.gather(
+                *(batcher.submit(r, predictor) for r in requests)
+            )
+        finally:
+            await batcher.stop()
+        return predictor, requests, results
+
+    predictor, requests, results = run(scenario())
+
+    assert predictor.batch_calls == [requests]
+    assert predictor.single_calls == []
+    assert results == [2.0, 4.0, 6.0, 8.0, 10.0]
+
+
+def test_lone_request_uses_predict_single():
+    async def scenario():
+        batcher = PredictionBatcher(_predict_batch, max_wait_ms=1)
+        predictor = FakePredictor()
+        try:
+            result = await batcher.submit(make_request(7.0), predictor)
+        finally:
+            await batcher.stop()
+        return predictor, result
+
+    predictor, result = run(scenario())
+
+    assert result == 14.0
+    assert len(predictor.single_calls) == 1
+    assert predictor.batch_calls == []
+
+
+def test_batch_error_fans_out_to_every_caller():
+    async def scenario():
+        batcher = PredictionBatcher(_predict_batch, max_wait_ms=50)
+        predictor = FakePredictor(error=ValueError("model exploded"))
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(make_request(d), predictor) for d in (1.0, 2.0, 3.0)),
+                return_exceptions=True
+            )
+        finally:
+            await batcher.stop()
+
+    results = run(scenario())
+
+    assert len(results) == 3
+    for result in results:
+        assert isinstance(result, ValueError)
+        assert str(result) == "model exploded"
+
+
+def test_batches_are_split_per_predictor():
+    async def scenario():
+        batcher = PredictionBatcher(_predict_batch, max_wait_ms=50)
+        doubler = FakePredictor(factor=2.0)
+        tripler = FakePredictor(factor=3.0)
+        submissions = [
+            (make_request(1.0), doubler),
+            (make_request(2.0), tripler),
+            (make_request(3.0), doubler),
+            (make_request(4.0), tripler),
+        ]
+        try:
+            results = await asyncio.gather(
+                *(batcher.submit(r, p) for r, p in submissions)
+            )
+        finally:
+            await batcher.stop()
+        return doubler, tripler, submissions, results
+
+    doubler, tripler, submissions, results = run(scenario())
+
+    assert doubler.batch_calls == [[submissions[0][0], submissions[2][0]]]
+    assert tripler.batch_calls == [[submissions[1][0], submissions[3][0]]]
+    assert results == [2.0, 6.0, 6.0, 12.0]
+
+
+def test_stop_rejects_collected_and_queued_requests():
+    release = threading.Event()
+
+    def blocking_predict(predictor, requests):
+        release.wait(timeout=5)
+        return _predict_batch(predictor, requests)
+
+    async def scenario():
+        # One request per batch and one batch in flight: the first request
+        # runs, the second is collected waiting on the semaphore and the
+        # third stays in the queue
+        batcher = PredictionBatcher(
+            blocking_predict, max_batch=1, max_wait_ms=1, max_in_flight=1
+        )
+        predictor = FakePredictor()
+        tasks = []
+        for distance_km in (1.0, 2.0, 3.0):
+            tasks.append(asyncio.create_task(
+                batcher.submit(make_request(distance_km), predictor)
+            ))
+            await asyncio.sleep(0.02)
+
+        stopping = asyncio.create_task(batcher.stop())
+        await asyncio.sleep(0.02)
+        release.set()
+        await asyncio.wait_for(stopping, timeout=5)
+
+        return await asyncio.wait_for(
+            asyncio.gather(*tasks, return_exceptions=True), timeout=5
+        )
+
+    in_flight, collected, queued = run(scenario())
+
+    assert in_flight == 2.0
+    for result in (collected, queued):
+        assert isinstance(result, RuntimeError)
+        assert str(result) == "Prediction batcher stopped"